@@ -1,5 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 from PIL import Image
 
+try:
+    from numba import njit
+    from numba.extending import overload
+except ImportError:  # numba is optional; fall back to plain NumPy
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    def overload(func):
+        """Stand-in for numba.extending.overload; the Python version is used."""
+        return lambda impl: impl
+
 class CropAdjust:
     """
     A reusable Python class for adjusting a rectangle around dark text/objects in an image.
@@ -12,7 +29,7 @@ class CropAdjust:
         crop = CropAdjust(threshold=0.0, search_range=20, tolerance=20, expand_ratio=0.1)
 
         # 2) Convert an image to a 2D grayscale array
-        img = Image.open("example.jpg").convert('RGB')
+        img = Image.open("example.jpg")
         image_data = crop.image_to_byte_array(img)
 
         # 3) Provide an initial rectangle (x, y, w, h)
@@ -60,20 +77,14 @@ class CropAdjust:
     # ----------------------------------------------------------------
     def image_to_byte_array(self, image):
         """
-        Convert a PIL Image (RGB) to a 2D grayscale array: image_data[x][y] in [0..255].
-        :param image: PIL Image object in RGB mode
-        :return: 2D list of ints, dimensions [width][height]
+        Convert a PIL Image to a 2D grayscale array: image_data[y][x] in [0..255].
+        :param image: PIL Image object in any mode (RGB, RGBA, L, P, ...)
+        :return: 2D numpy uint8 array, row-major with dimensions [height][width]
         """
-        width, height = image.size
-        image_data = [[0]*height for _ in range(width)]
-
-        for y in range(height):
-            for x in range(width):
-                r, g, b = image.getpixel((x, y))
-                gray = int(0.299*r + 0.587*g + 0.114*b)
-                image_data[x][y] = gray
-
-        return image_data
+        # Pillow's 'L' conversion applies the ITU-R 601-2 luma transform in C
+        gray = image.convert('L')
+        # np.array, not np.asarray: the latter is a read-only view of Pillow's buffer
+        return np.array(gray, dtype=np.uint8)
 
     # ----------------------------------------------------------------
     # Public API: fix_rect
@@ -83,212 +94,362 @@ class CropAdjust:
         Given an image_data 2D array (grayscale) and an initial rectangle (x, y, w, h),
         returns an adjusted rectangle [x, y, width, height].
 
-        skipRows is computed from w//40 (at least 1).
+        image_data may be any 2D array-like indexed [y][x] (e.g. nested lists);
+        it is packed into one contiguous uint8 buffer before searching.
+        image_data may also be a PIL Image (any mode): then only the part of
+        the image the search can reach is cropped and converted to grayscale,
+        so a large image is never held in memory as a full array.
+        skipRows is computed from w//40 (at least 1). The right edge needs a
+        light gap of at least half the found text height, so the spacing
+        between letters of a word does not end the box.
         """
-        skip_rows = max(1, w // 40)
-        adjusted = self._find_change_layer(image_data, x, y, w, h, skip_rows)
-        return adjusted
+        return self._fix_rect(image_data, x, y, w, h, self._search_config())
 
     # ----------------------------------------------------------------
-    # Internal logic: find_change_layer
+    # Public API: fix_rects
     # ----------------------------------------------------------------
-    def _find_change_layer(self, image_data, x, y, w, h, skip_rows):
+    def fix_rects(self, image_data, rects, max_workers=None):
         """
-        Finds the bounding rectangle around dark text/objects by searching
-        row/col boundaries and adjusting. Returns [x, y, width, height].
+        Adjusts many rectangles (x, y, w, h) on the same image_data (array or
+        PIL Image, as in fix_rect) and returns the adjusted rectangles in the
+        same order.
+
+        Each rectangle is independent and only reads image_data, so they
+        are spread over a thread pool; with numba installed the search runs
+        without the GIL and scales with the number of cores.
+        :param max_workers: (int) thread pool size, None => executor default
         """
-        dark_color = self._get_darkest_average_color(image_data, x, y, w, h)
-
-        # We'll store the rect in [x, y, w, h] form
-        rect = [x, y, w, h]
-
-        # ------------------------------------------------------------
-        # A) Adjust Y direction
-        # ------------------------------------------------------------
-        start_x = rect[0]
-        end_x   = rect[0] + rect[2]
-
-        row_rate = self._find_row_dark_rate(image_data, direction=0,
-                                            index=rect[1],
-                                            start=start_x,
-                                            end=end_x,
-                                            dark=dark_color,
-                                            tol=self.tolerance)
-        if row_rate <= self.threshold:
-            # move downward
-            for yy in range(rect[1], rect[1] + rect[3]):
-                row_rate = self._find_row_dark_rate(image_data, 0, yy,
-                                                    start_x, end_x,
-                                                    dark_color, self.tolerance)
-                if row_rate > self.threshold:
-                    rect[1] = yy
-                    break
+        if isinstance(image_data, Image.Image):
+            # decode once up front rather than racing to load in each worker
+            image_data.load()
         else:
-            # move upward
-            start_y = rect[1]
-            for yy in range(start_y, start_y - self.search_range, -1):
-                if yy < 0:
-                    break
-                row_rate = self._find_row_dark_rate(image_data, 0, yy,
-                                                    start_x, end_x,
-                                                    dark_color, self.tolerance)
-                if row_rate <= self.threshold:
-                    rect[1] = yy
-                    break
-
-        # find where it goes light again
-        for yy in range(rect[1] + 1, rect[1] + h):
-            row_rate = self._find_row_dark_rate(image_data, 0, yy,
-                                                start_x, end_x,
-                                                dark_color, self.tolerance)
-            if row_rate <= self.threshold:
-                rect[3] = yy
-                break
-
-        # ------------------------------------------------------------
-        # B) Adjust X direction
-        # ------------------------------------------------------------
-        start_y = rect[1]
-        end_y   = rect[1] + rect[3]
-
-        col_rate = self._find_row_dark_rate(image_data, direction=1,
-                                            index=x,
-                                            start=start_y,
-                                            end=end_y,
-                                            dark=dark_color,
-                                            tol=self.tolerance)
-        if col_rate <= self.threshold:
-            # move right
-            skipping = skip_rows
-            for xx in range(x, x + w):
-                col_rate = self._find_row_dark_rate(image_data, 1, xx,
-                                                    start_y, end_y,
-                                                    dark_color, self.tolerance)
-                if col_rate > self.threshold:
-                    rect[0] = xx
-                    skipping -= 1
-                    if skipping == 0:
-                        break
-                    else:
-                        skipping = skip_rows
-        else:
-            # move left
-            skipping = skip_rows
-            for xx in range(x, x - self.search_range, -1):
-                if xx < 0:
-                    break
-                col_rate = self._find_row_dark_rate(image_data, 1, xx,
-                                                    start_y, end_y,
-                                                    dark_color, self.tolerance)
-                if col_rate <= self.threshold:
-                    rect[0] = xx
-                    skipping -= 1
-                    if skipping == 0:
-                        break
-                    else:
-                        skipping = skip_rows
-
-        # find where it becomes light
-        skipping = skip_rows
-        for xx in range(rect[0] + 1, rect[0] + w):
-            col_rate = self._find_row_dark_rate(image_data, 1, xx,
-                                                start_y, end_y,
-                                                dark_color, self.tolerance)
-            if col_rate <= self.threshold:
-                rect[2] = xx
-                skipping -= 1
-                if skipping == 0:
-                    break
-                else:
-                        skipping = skip_rows
-
-        # Convert (x, y, x2, y2) => (x, y, width, height)
-        rect[2] -= rect[0]
-        rect[3] -= rect[1]
-
-        # ------------------------------------------------------------
-        # C) Expand final rectangle by expand_ratio
-        # ------------------------------------------------------------
-        expand_x = int(rect[2] * self.expand_ratio)
-        expand_y = int(rect[3] * self.expand_ratio)
-
-        rect[0] -= expand_x
-        rect[1] -= expand_y
-        rect[2] += expand_x * 2
-        rect[3] += expand_y * 2
-
-        return rect
+            image_data = np.ascontiguousarray(image_data, dtype=np.uint8)
+
+        # Read the configuration once for the whole batch, not per rectangle
+        config = self._search_config()
+        fix = self._fix_rect
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda rect: fix(image_data, *rect, config),
+                                     rects))
 
     # ----------------------------------------------------------------
-    # Internal helper: darkest average color
+    # Internal logic: fix one rectangle
     # ----------------------------------------------------------------
-    def _get_darkest_average_color(self, image_data, x, y, w, h):
+    def _fix_rect(self, image_data, x, y, w, h, config):
         """
-        Returns an int in [0..255], the darkest average color in [x, y, w, h].
+        Body of fix_rect, with config already read by _search_config().
+        Returns [x, y, width, height].
         """
-        width  = len(image_data)
-        height = len(image_data[0])
-
-        total = 0
-        count = 0
-        min_gray = 255
-
-        for yy in range(y, y + h):
-            if yy < 0 or yy >= height:
-                continue
-            for xx in range(x, x + w):
-                if xx < 0 or xx >= width:
-                    continue
-                val = image_data[xx][yy]
-                total += val
-                count += 1
-                if val < min_gray:
-                    min_gray = val
-
-        if count == 0:
-            return 0
-        avg_gray = total // count
-        return min(avg_gray, min_gray)
+        skip_rows = max(1, w // 40)
 
-    # ----------------------------------------------------------------
-    # Internal helper: row or column dark rate
-    # ----------------------------------------------------------------
-    def _find_row_dark_rate(self, image_data, direction, index,
-                            start, end, dark, tol):
+        if isinstance(image_data, Image.Image):
+            width, height = image_data.size
+            row_first, row_last, col_first, col_last = _search_bounds(
+                x, y, w, h, config[1])
+            top = min(height, max(0, row_first))
+            left = min(width, max(0, col_first))
+            bottom = min(height, max(top, row_last))
+            right = min(width, max(left, col_last))
+
+            region = self.image_to_byte_array(image_data.crop((left, top, right, bottom)))
+            adjusted = _find_change_layer(region, x - left, y - top, w, h,
+                                          skip_rows, *config)
+            adjusted[0] += left
+            adjusted[1] += top
+            return adjusted
+
+        image_data = np.ascontiguousarray(image_data, dtype=np.uint8)
+        return _find_change_layer(image_data, x, y, w, h, skip_rows, *config)
+
+    def _search_config(self):
         """
-        direction=0 => row mode (index is y), direction=1 => column mode (index is x).
-        Returns ratio = dark_pixels / total_pixels in [start..end].
+        Returns (threshold, search_range, tolerance, expand_ratio) as the
+        scalar arguments of the module-level search.
         """
-        width  = len(image_data)
-        height = len(image_data[0])
-
-        lower = max(0, dark - abs(tol))
-        upper = min(255, dark + abs(tol))
-
-        dark_pixels = 0
-        total_pixels = 0
-
-        if direction == 0:
-            # row mode => index is y
-            y = index
-            if 0 <= y < height:
-                for x in range(start, end):
-                    if 0 <= x < width:
-                        val = image_data[x][y]
-                        if lower <= val <= upper:
-                            dark_pixels += 1
-                        total_pixels += 1
+        # Pin the configuration to fixed scalar types so the compiled
+        # search is specialized once, e.g. threshold=0 and threshold=0.0
+        # share one build instead of compiling twice.
+        return (float(self.threshold), int(self.search_range),
+                int(self.tolerance), float(self.expand_ratio))
+
+
+# ----------------------------------------------------------------
+# Internal logic: find_change_layer
+# ----------------------------------------------------------------
+@njit(cache=True, nogil=True)
+def _find_change_layer(image_data, x, y, w, h, skip_rows,
+                       threshold, search_range, tolerance, expand_ratio):
+    """
+    Finds the bounding rectangle around dark text/objects by searching
+    row/col boundaries and adjusting. Returns [x, y, width, height].
+
+    Compiled with numba when it is installed, so the whole search runs as
+    native code without holding the GIL; otherwise it runs as plain Python
+    over NumPy slices.
+    """
+    dark_color = _get_darkest_average_color(image_data, x, y, w, h)
+    lower = max(0, dark_color - abs(tolerance))
+    upper = min(255, dark_color + abs(tolerance))
+
+    # Rows (Y phase) and columns (X phase) the searches below can visit
+    row_first, row_last, col_first, col_last = _search_bounds(x, y, w, h,
+                                                              search_range)
+
+    # Test every pixel either phase can visit against the dark range once;
+    # both phases then only read this mask.
+    height, width = image_data.shape
+    mask_top = max(0, row_first)
+    mask_left = max(0, col_first)
+    mask_bottom = min(height, max(mask_top, row_last))
+    mask_right = min(width, max(mask_left, col_last))
+    dark_mask = _dark_mask(image_data[mask_top:mask_bottom, mask_left:mask_right],
+                           lower, upper)
+
+    # We'll store the rect in [x, y, w, h] form
+    rect = [x, y, w, h]
+
+    # ------------------------------------------------------------
+    # A) Adjust Y direction
+    # ------------------------------------------------------------
+    start_x = rect[0]
+    end_x   = rect[0] + rect[2]
+
+    row_rates = _find_dark_rates(dark_mask, 0,
+                                 row_first - mask_top, row_last - mask_top,
+                                 start_x - mask_left, end_x - mask_left, threshold)
+
+    row_rate = row_rates[rect[1] - row_first]
+    if row_rate <= threshold:
+        # move downward: first dark row in [y..y+h)
+        rates = row_rates[y - row_first:y + h - row_first]
+        i = _first_true(rates > threshold)
+        if i >= 0:
+            rect[1] = y + i
+    else:
+        # move upward: first light row in (y-search_range..y], stopping at 0
+        top = max(0, y - search_range + 1)
+        rates = row_rates[top - row_first:y + 1 - row_first][::-1]
+        i = _first_true(rates <= threshold)
+        if i >= 0:
+            rect[1] = y - i
+
+    # find where it goes light again (bottom edge; defaults to rect[1] + h)
+    rect[3] = rect[1] + h
+    rates = row_rates[rect[1] + 1 - row_first:rect[1] + h - row_first]
+    i = _first_true(rates <= threshold)
+    if i >= 0:
+        rect[3] = rect[1] + 1 + i
+
+    # ------------------------------------------------------------
+    # B) Adjust X direction
+    # ------------------------------------------------------------
+    start_y = rect[1]
+    end_y   = rect[3]
+
+    col_rates = _find_dark_rates(dark_mask, 1,
+                                 col_first - mask_left, col_last - mask_left,
+                                 start_y - mask_top, end_y - mask_top, threshold)
+
+    # Edges need skip_rows consecutive columns to confirm, so isolated
+    # specks are not mistaken for the start or end of the text.
+    col_rate = col_rates[x - col_first]
+    if col_rate <= threshold:
+        # move right: first run of dark columns in [x..x+w)
+        rates = col_rates[x - col_first:x + w - col_first]
+        i = _first_run(rates > threshold, skip_rows)
+        if i >= 0:
+            rect[0] = x + i
+    else:
+        # move left: first run of light columns in (x-search_range..x],
+        # stopping at 0
+        left = max(0, x - search_range + 1)
+        rates = col_rates[left - col_first:x + 1 - col_first][::-1]
+        i = _first_run(rates <= threshold, skip_rows)
+        if i >= 0:
+            rect[0] = x - i
+
+    # find where it becomes light (right edge; defaults to rect[0] + w).
+    # The gap that ends the text scales with the line height found above,
+    # so the spacing between letters of a word does not end the box.
+    light_run = max(skip_rows, (end_y - start_y) // 2)
+    rect[2] = rect[0] + w
+    rates = col_rates[rect[0] + 1 - col_first:rect[0] + w - col_first]
+    i = _first_run(rates <= threshold, light_run)
+    if i >= 0:
+        rect[2] = rect[0] + 1 + i
+
+    # Convert (x, y, x2, y2) => (x, y, width, height)
+    rect[2] -= rect[0]
+    rect[3] -= rect[1]
+
+    # ------------------------------------------------------------
+    # C) Expand final rectangle by expand_ratio
+    # ------------------------------------------------------------
+    expand_x = int(rect[2] * expand_ratio)
+    expand_y = int(rect[3] * expand_ratio)
+
+    rect[0] -= expand_x
+    rect[1] -= expand_y
+    rect[2] += expand_x * 2
+    rect[3] += expand_y * 2
+
+    return rect
+
+
+# ----------------------------------------------------------------
+# Internal helper: search bounds
+# ----------------------------------------------------------------
+@njit(cache=True, nogil=True)
+def _search_bounds(x, y, w, h, search_range):
+    """
+    Returns (row_first, row_last, col_first, col_last): the rows and columns
+    _find_change_layer can visit for rect [x, y, w, h], not yet clipped to
+    the image. Nothing outside them affects the result.
+    """
+    reach = max(search_range - 1, 0)
+    return y - reach, y + max(2 * h, 1), x - reach, x + max(2 * w, 1)
+
+
+# ----------------------------------------------------------------
+# Internal helpers: first match in a batch of rates
+# ----------------------------------------------------------------
+@njit(cache=True, nogil=True)
+def _first_true(flags):
+    """
+    Returns the index of the first True in a 1D bool array, or -1 if none.
+    """
+    if flags.size == 0:
+        return -1
+    i = int(np.argmax(flags))
+    if flags[i]:
+        return i
+    return -1
+
+
+@njit(cache=True, nogil=True)
+def _first_run(flags, length):
+    """
+    Returns the index where the first run of `length` consecutive True
+    values starts in a 1D bool array, or -1 if there is none.
+    """
+    if flags.size < length:
+        return -1
+    counts = np.zeros(flags.size + 1, dtype=np.int64)
+    counts[1:] = np.cumsum(flags.astype(np.int64))
+    return _first_true(counts[length:] - counts[:flags.size + 1 - length] == length)
+
+
+# ----------------------------------------------------------------
+# Internal helper: darkest average color
+# ----------------------------------------------------------------
+@njit(cache=True, nogil=True)
+def _get_darkest_average_color(image_data, x, y, w, h):
+    """
+    Returns an int in [0..255], the darkest average color in [x, y, w, h].
+    """
+    height, width = image_data.shape
+
+    # clamp the stops too: a negative stop would wrap to the far edge
+    region = image_data[max(0, y):max(0, min(height, y + h)),
+                        max(0, x):max(0, min(width, x + w))]
+    if region.size == 0:
+        return 0
+
+    avg_gray = int(region.mean())
+    min_gray = int(region.min())
+    return min(avg_gray, min_gray)
+
+
+# ----------------------------------------------------------------
+# Internal helper: dark rates for a run of rows or columns
+# ----------------------------------------------------------------
+@njit(cache=True, nogil=True)
+def _find_dark_rates(dark_mask, direction, first, last, start, end,
+                     threshold):
+    """
+    direction=0 => rows first..last, each measured over columns start..end.
+    direction=1 => columns first..last, each measured over rows start..end.
+    Coordinates are relative to dark_mask, a 2D bool array from _dark_mask.
+    Returns rates[i] = dark_pixels / total_pixels of line first + i.
+    Lines outside the mask have rate 0.0, so callers can index rates
+    directly without bounds checks.
+
+    The search only compares rates against threshold, so only as much is
+    computed as that comparison needs: with threshold <= 0 a line's rate is
+    1.0 if it has any dark pixel, and with threshold >= 1 nothing is counted.
+    """
+    height, width = dark_mask.shape
+    if direction == 0:
+        limit, span = height, width
+    else:
+        limit, span = width, height
+
+    rates = np.zeros(max(0, last - first))
+
+    lo, hi = max(0, first), min(limit, last)
+    start, end = max(0, start), min(span, end)
+    if lo >= hi or start >= end or threshold >= 1.0:
+        return rates
+
+    if direction == 0:
+        strip, axis = dark_mask[lo:hi, start:end], 1
+    else:
+        strip, axis = dark_mask[start:end, lo:hi], 0
+
+    if threshold <= 0.0:
+        rates[lo - first:hi - first] = _any_along(strip, axis)
+    else:
+        counts = strip.sum(axis=axis)
+        rates[lo - first:hi - first] = counts / float(end - start)
+    return rates
+
+
+# ----------------------------------------------------------------
+# Internal helper: dark pixel mask
+# ----------------------------------------------------------------
+@njit(cache=True, nogil=True)
+def _dark_mask(region, lower, upper):
+    """
+    Returns a bool array marking the pixels of region in [lower..upper].
+
+    Uses one unsigned compare instead of two: pixel - lower wraps around
+    in uint8, so it is <= upper - lower exactly when the pixel is in range.
+    """
+    return (region - np.uint8(lower)) <= np.uint8(upper - lower)
+
+
+# ----------------------------------------------------------------
+# Internal helper: any True per line
+# ----------------------------------------------------------------
+def _any_along(strip, axis):
+    """
+    Returns True for each line of a 2D bool strip that has a True value,
+    reducing over axis (1 => per row, 0 => per column).
+    """
+    return strip.any(axis=axis)
+
+
+@overload(_any_along)
+def _any_along_loop(strip, axis):
+    """
+    Compiled version of _any_along: numba has no any(axis=...), and a loop
+    can stop scanning a line at its first True.
+    """
+    def impl(strip, axis):
+        rows, cols = strip.shape
+        if axis == 1:
+            found = np.zeros(rows, dtype=np.bool_)
+            for i in range(rows):
+                for j in range(cols):
+                    if strip[i, j]:
+                        found[i] = True
+                        break
         else:
-            # column mode => index is x
-            x = index
-            if 0 <= x < width:
-                for y in range(start, end):
-                    if 0 <= y < height:
-                        val = image_data[x][y]
-                        if lower <= val <= upper:
-                            dark_pixels += 1
-                        total_pixels += 1
-
-        if total_pixels == 0:
-            return 0.0
-        return dark_pixels / float(total_pixels)
+            found = np.zeros(cols, dtype=np.bool_)
+            for j in range(cols):
+                for i in range(rows):
+                    if strip[i, j]:
+                        found[j] = True
+                        break
+        return found
+    return impl
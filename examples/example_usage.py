@@ -11,7 +11,7 @@ def main():
     crop = CropAdjust(threshold=0.0, search_range=20, tolerance=20, expand_ratio=0.1)
 
     # Load image and convert to 2D grayscale
-    img = Image.open(img_path).convert('RGB')
+    img = Image.open(img_path)
     image_data = crop.image_to_byte_array(img)
 
     # Provide a rectangle (x, y, w, h)
@@ -21,5 +21,11 @@ def main():
     result = crop.fix_rect(image_data, x, y, w, h)
     print("Adjusted rectangle:", result)
 
+    # Adjust every rectangle listed in the matching .txt file (one x,y,w,h per line)
+    with open(os.path.join("samples", "03.txt")) as fh:
+        rects = [tuple(int(v) for v in line.split(",")) for line in fh if line.strip()]
+    for rect, adjusted in zip(rects, crop.fix_rects(image_data, rects)):
+        print(rect, "=>", adjusted)
+
 if __name__ == "__main__":
     main()
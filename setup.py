@@ -16,6 +16,10 @@ setuptools.setup(
     packages=setuptools.find_packages(),  # automatically finds "crop_adjust" package
     install_requires=[
         "Pillow>=9.0.0",
+        "numpy>=1.17",
     ],
+    extras_require={
+        "numba": ["numba>=0.56"],
+    },
     python_requires=">=3.7",
 )
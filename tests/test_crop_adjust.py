@@ -1,6 +1,10 @@
+import os
+import numpy as np
 import pytest
 from crop_adjust import CropAdjust
 
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "samples")
+
 def test_fix_rect_simple():
     crop = CropAdjust()
     
@@ -18,3 +22,128 @@ def test_fix_rect_simple():
     # (You can refine these checks or mock partial logic.)
     assert 0 <= result[0] <= 100
     assert 0 <= result[1] <= 100
+
+def test_fix_rect_rect_above_image():
+    crop = CropAdjust(threshold=0.5, search_range=5, tolerance=0)
+
+    # Gray columns at x=32..33 lie outside the rect and must not be counted,
+    # even though the rect starts above the image (y < 0).
+    image_data = np.full((9, 34), 255, dtype=np.uint8)
+    image_data[:, 32:34] = 185
+
+    assert crop.fix_rect(image_data, 23, -3, 23, 5) == [23, -3, 1, 1]
+
+def test_darkest_color_of_rect_outside_image():
+    from crop_adjust.crop_adjust import _get_darkest_average_color
+
+    image_data = np.full((10, 20), 200, dtype=np.uint8)
+
+    # Rects ending above / left of the image cover no pixels
+    assert _get_darkest_average_color(image_data, -4, -5, 3, 13) == 0
+    assert _get_darkest_average_color(image_data, -4, -5, 13, 3) == 0
+    assert _get_darkest_average_color(image_data, 2, 3, 4, 4) == 200
+
+def test_image_to_byte_array():
+    from PIL import Image
+
+    crop = CropAdjust()
+
+    # 3x2 RGB image: black, white, pure red on top; gray row below
+    img = Image.new("RGB", (3, 2), (128, 128, 128))
+    img.putpixel((0, 0), (0, 0, 0))
+    img.putpixel((1, 0), (255, 255, 255))
+    img.putpixel((2, 0), (255, 0, 0))
+
+    image_data = crop.image_to_byte_array(img)
+
+    assert image_data.shape == (2, 3)
+    assert image_data.flags.writeable
+    assert image_data[0][0] == 0
+    assert image_data[0][1] == 255
+    assert image_data[0][2] == 76
+    assert image_data[1][1] == 128
+
+    # Any Pillow mode is accepted, not just RGB
+    assert (crop.image_to_byte_array(img.convert("RGBA")) == image_data).all()
+
+def test_fix_rect_accepts_nested_lists():
+    crop = CropAdjust()
+
+    # White 60x40 image with a dark block at x=20..39, y=10..19
+    image_data = np.full((40, 60), 255, dtype=np.uint8)
+    image_data[10:20, 20:40] = 0
+
+    expected = crop.fix_rect(image_data, 15, 5, 30, 20)
+    assert crop.fix_rect(image_data.tolist(), 15, 5, 30, 20) == expected
+    assert crop.fix_rect(image_data[:, ::-1][:, ::-1], 15, 5, 30, 20) == expected
+
+def test_config_types_do_not_change_result():
+    image_data = np.full((40, 60), 255, dtype=np.uint8)
+    image_data[10:20, 20:40] = 0
+
+    as_floats = CropAdjust(threshold=0.0, search_range=20, tolerance=20, expand_ratio=0.1)
+    as_ints = CropAdjust(threshold=0, search_range=20.0, tolerance=20.0, expand_ratio=0.1)
+
+    assert (as_floats.fix_rect(image_data, 15, 5, 30, 20)
+            == as_ints.fix_rect(image_data, 15, 5, 30, 20))
+
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        return
+    from crop_adjust.crop_adjust import _find_change_layer
+
+    # Both configs must share one compiled kernel.
+    assert len(_find_change_layer.signatures) == 1
+
+def test_fix_rect_bridges_gaps_narrower_than_skip_rows():
+    crop = CropAdjust()
+
+    # Two dark blocks separated by a single light column (x=40).
+    # w=80 gives skip_rows=2, so the one-column gap must not end the rect.
+    image_data = np.full((40, 100), 255, dtype=np.uint8)
+    image_data[10:20, 20:40] = 0
+    image_data[10:20, 41:60] = 0
+
+    result = crop.fix_rect(image_data, 15, 5, 80, 20)
+
+    assert result == [16, 9, 48, 12]
+    assert all(type(v) is int for v in result)
+
+def test_fix_rect_sample_keeps_whole_word():
+    from PIL import Image
+
+    crop = CropAdjust()
+    image = Image.open(os.path.join(SAMPLES_DIR, "03.jpg"))
+    image_data = crop.image_to_byte_array(image)
+
+    # The rect around "AHMED": gaps between its letters are narrower than
+    # half the text height, so the box must run past the last letter.
+    assert crop.fix_rect(image_data, 190, 125, 172, 31) == [186, 117, 100, 19]
+
+def test_fix_rects_matches_fix_rect():
+    crop = CropAdjust()
+
+    image_data = np.full((60, 100), 255, dtype=np.uint8)
+    image_data[10:20, 20:40] = 0
+    image_data[35:50, 50:90] = 30
+
+    rects = [(15, 5, 30, 20), (45, 30, 50, 25), (0, 0, 10, 10)]
+    expected = [crop.fix_rect(image_data, *rect) for rect in rects]
+
+    assert crop.fix_rects(image_data, rects, max_workers=2) == expected
+
+def test_fix_rect_accepts_pil_image():
+    from PIL import Image
+
+    crop = CropAdjust()
+
+    image_data = np.full((300, 400), 255, dtype=np.uint8)
+    image_data[110:125, 220:300] = 20
+    image_data[200:230, 10:60] = 0
+    img = Image.fromarray(image_data).convert("RGB")
+
+    for rect in [(210, 100, 100, 30), (0, 190, 70, 40), (380, 290, 40, 20)]:
+        assert crop.fix_rect(img, *rect) == crop.fix_rect(image_data, *rect)
+    assert (crop.fix_rects(img, [(210, 100, 100, 30)])
+            == [crop.fix_rect(image_data, 210, 100, 100, 30)])